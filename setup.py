@@ -1,4 +1,4 @@
-from setuptools import setup, find_packages
+from setuptools import setup, find_packages, Extension
 from pathlib import Path
 
 # Cargar el README como descripción larga
@@ -15,6 +15,15 @@ setup(
     url='https://github.com/villeparamio/tm1637-rpi5-gpiod',
     license='MIT',
     packages=find_packages(),
+    # Extensión opcional: si no compila (sin cabeceras de Linux/Python) se
+    # instala igualmente y el driver usa el camino en Python puro
+    ext_modules=[
+        Extension(
+            'tm1637._tm1637_c',
+            sources=['tm1637/_tm1637_c.c'],
+            optional=True,
+        ),
+    ],
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
@@ -0,0 +1,71 @@
+"""Acceso directo por MMIO a los registros RIO del RP1 (Raspberry Pi 5).
+
+En la Pi 5 los GPIO de usuario cuelgan del RP1, no del BCM2835, y
+`/dev/gpiomem0` expone su banco 0 sin necesidad de root:
+
+    +0x00000  IO_BANK0    (funcsel / estado)
+    +0x10000  SYS_RIO0    (registered IO: OUT, OE, IN)
+    +0x20000  PADS_BANK0
+
+Cada registro RIO tiene alias atómicos (+0x1000 XOR, +0x2000 SET,
++0x3000 CLR), de modo que subir o bajar una línea es una única escritura de
+32 bits, sin ioctl ni cambio de contexto.
+
+Solo se tocan los registros de salida: la configuración de la línea
+(función SYS_RIO, dirección de salida) la sigue haciendo gpiod al pedir las
+líneas, así que este backend va siempre sobre una petición gpiod ya hecha.
+"""
+
+import ctypes
+import mmap
+import os
+
+RP1_GPIOMEM = "/dev/gpiomem0"
+RP1_BANK0_LINES = 28
+
+_SYS_RIO0 = 0x10000
+_RIO_OUT = 0x00
+_RIO_SET = 0x2000
+_RIO_CLR = 0x3000
+
+# Ventana mapeada: desde SYS_RIO0 hasta el final de la página del alias CLR
+_MAP_OFFSET = _SYS_RIO0
+_MAP_SIZE = _RIO_CLR + mmap.PAGESIZE
+
+
+class RP1RIO:
+    """
+    Registros SET/CLR de RIO_OUT del banco 0 del RP1, mapeados en memoria.
+
+    `set_reg.value = mask` sube las líneas de `mask` y `clr_reg.value = mask`
+    las baja. Lanza OSError si `/dev/gpiomem0` no existe o no se puede mapear.
+    """
+
+    def __init__(self, path: str = RP1_GPIOMEM):
+        fd = os.open(path, os.O_RDWR | os.O_SYNC)
+        try:
+            self._mem = mmap.mmap(
+                fd,
+                _MAP_SIZE,
+                flags=mmap.MAP_SHARED,
+                prot=mmap.PROT_READ | mmap.PROT_WRITE,
+                offset=_MAP_OFFSET,
+            )
+        finally:
+            os.close(fd)
+
+        # c_uint32.from_buffer garantiza accesos de 32 bits a la ventana
+        self.set_reg = ctypes.c_uint32.from_buffer(self._mem, _RIO_SET + _RIO_OUT)
+        self.clr_reg = ctypes.c_uint32.from_buffer(self._mem, _RIO_CLR + _RIO_OUT)
+
+    def close(self) -> None:
+        # Quien haya copiado set_reg/clr_reg debe soltarlos antes: mmap no se
+        # cierra mientras haya vistas exportadas
+        self.set_reg = self.clr_reg = None
+        self._mem.close()
+
+    @staticmethod
+    def line_mask(line_offset: int) -> int:
+        if not 0 <= line_offset < RP1_BANK0_LINES:
+            raise ValueError(f"GPIO {line_offset} is not in RP1 bank 0")
+        return 1 << line_offset
@@ -0,0 +1,166 @@
+"""Temporización de alta resolución para el bit-banging del TM1637.
+
+`time.sleep()` en CPython usa un `nanosleep` relativo: en Linux cada espera
+de ~10µs acaba durando 60-1000µs y el error se acumula en cada flanco.
+Aquí se trabaja con plazos absolutos sobre CLOCK_MONOTONIC: las esperas
+largas se delegan en `clock_nanosleep(TIMER_ABSTIME)` y las cortas se
+resuelven con espera activa, igual que hacía WiringPi.
+
+Como alternativa sin espera activa, `EdgeTimer` usa un timerfd periódico:
+cada espera es un `read()` que bloquea hasta el siguiente tick.
+"""
+
+import ctypes
+import ctypes.util
+import os
+from time import monotonic_ns, sleep
+
+CLOCK_MONOTONIC = 1
+TIMER_ABSTIME = 1
+TFD_CLOEXEC = os.O_CLOEXEC
+_EINTR = 4
+
+# Por debajo de este margen el planificador no es fiable: espera activa
+SPIN_THRESHOLD_NS = 100_000
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+_libc = None
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+    _clock_nanosleep = _libc.clock_nanosleep
+    _clock_nanosleep.argtypes = [
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.POINTER(_Timespec),
+        ctypes.POINTER(_Timespec),
+    ]
+    _clock_nanosleep.restype = ctypes.c_int
+except (OSError, AttributeError):  # libc sin clock_nanosleep
+    _clock_nanosleep = None
+
+
+class _Itimerspec(ctypes.Structure):
+    _fields_ = [("it_interval", _Timespec), ("it_value", _Timespec)]
+
+
+# timerfd: os.timerfd_* desde Python 3.13; antes, la libc vía ctypes
+_HAS_OS_TIMERFD = hasattr(os, "timerfd_create")
+_timerfd_create = None
+_timerfd_settime = None
+if not _HAS_OS_TIMERFD and _libc is not None:
+    try:
+        _timerfd_create = _libc.timerfd_create
+        _timerfd_create.argtypes = [ctypes.c_int, ctypes.c_int]
+        _timerfd_create.restype = ctypes.c_int
+        _timerfd_settime = _libc.timerfd_settime
+        _timerfd_settime.argtypes = [
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.POINTER(_Itimerspec),
+            ctypes.POINTER(_Itimerspec),
+        ]
+        _timerfd_settime.restype = ctypes.c_int
+    except AttributeError:  # libc sin timerfd
+        _timerfd_create = None
+        _timerfd_settime = None
+
+
+def sleep_until(deadline_ns: int) -> None:
+    """
+    Duerme hasta `deadline_ns` (CLOCK_MONOTONIC, en nanosegundos).
+
+    Usa `clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, ...)` si está
+    disponible; si no, cae a `time.sleep()` con el tiempo restante.
+    """
+    if _clock_nanosleep is None:
+        remaining = deadline_ns - monotonic_ns()
+        if remaining > 0:
+            sleep(remaining / 1_000_000_000)
+        return
+
+    ts = _Timespec(deadline_ns // 1_000_000_000, deadline_ns % 1_000_000_000)
+    while _clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, ctypes.byref(ts), None) == _EINTR:
+        pass
+
+
+def wait_until(deadline_ns: int) -> int:
+    """
+    Espera hasta `deadline_ns` y devuelve el instante real de salida.
+
+    Si el plazo ya ha pasado (por ejemplo, tras una expropiación), se vuelve
+    inmediatamente con la hora actual, de modo que el siguiente plazo se
+    calcule desde ahí y no se encadenen flancos sin separación.
+    """
+    now = monotonic_ns()
+    if deadline_ns - now > SPIN_THRESHOLD_NS:
+        sleep_until(deadline_ns)
+        now = monotonic_ns()
+    while now < deadline_ns:
+        now = monotonic_ns()
+    return now
+
+
+class EdgeTimer:
+    """
+    Temporizador periódico (timerfd sobre CLOCK_MONOTONIC) para separar flancos.
+
+    `arm()` lo pone en marcha con periodo `interval_ns`, cada `wait()` bloquea
+    hasta el siguiente tick y `disarm()` lo para. Si una espera llega tarde
+    (más de un tick vencido) se rearma desde ese instante, para que el
+    siguiente flanco no salga pegado al anterior.
+
+    Lanza OSError si el sistema no tiene timerfd.
+    """
+
+    def __init__(self, interval_ns: int):
+        self.interval_ns = interval_ns
+
+        if _HAS_OS_TIMERFD:
+            self.fd = os.timerfd_create(CLOCK_MONOTONIC, flags=TFD_CLOEXEC)
+        elif _timerfd_create is not None:
+            self.fd = _timerfd_create(CLOCK_MONOTONIC, TFD_CLOEXEC)
+            if self.fd < 0:
+                err = ctypes.get_errno()
+                raise OSError(err, os.strerror(err))
+        else:
+            raise OSError("timerfd is not available")
+
+    def _settime(self, interval_ns: int) -> None:
+        if _HAS_OS_TIMERFD:
+            os.timerfd_settime_ns(self.fd, initial=interval_ns, interval=interval_ns)
+            return
+
+        ts = _Timespec(interval_ns // 1_000_000_000, interval_ns % 1_000_000_000)
+        spec = _Itimerspec(ts, ts)
+        if _timerfd_settime(self.fd, 0, ctypes.byref(spec), None) < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def arm(self) -> None:
+        self._settime(self.interval_ns)
+
+    def wait(self, _deadline_ns: int = 0) -> int:
+        # Misma firma que wait_until() para poder usarlos indistintamente; el
+        # 0 devuelto solo cumple esa forma (el plazo lo lleva el timerfd)
+        ticks = int.from_bytes(os.read(self.fd, 8), "little")
+        if ticks > 1:
+            self.arm()
+        return 0
+
+    def disarm(self) -> None:
+        self._settime(0)
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:  # noqa: BLE001
+            pass
@@ -0,0 +1,209 @@
+/*
+ * Camino rápido en C para el bit-banging del TM1637.
+ *
+ * Escribe los flancos de CLK/DIO directamente con
+ * ioctl(GPIO_V2_LINE_SET_VALUES_IOCTL) sobre el fd del LineRequest de
+ * gpiod v2, sin pasar por el intérprete entre flanco y flanco.
+ *
+ * License: MIT
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include <errno.h>
+#include <stdint.h>
+#include <string.h>
+#include <sys/ioctl.h>
+#include <sys/timerfd.h>
+#include <time.h>
+#include <unistd.h>
+
+#include <linux/gpio.h>
+
+/* Por debajo de este margen el planificador no es fiable: espera activa */
+#define SPIN_THRESHOLD_NS 100000LL
+
+static inline int64_t
+now_ns(void)
+{
+    struct timespec ts;
+
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (int64_t)ts.tv_sec * 1000000000LL + ts.tv_nsec;
+}
+
+/* Igual que _timing.wait_until(): devuelve el instante real de salida */
+static int64_t
+wait_until(int64_t deadline)
+{
+    int64_t now = now_ns();
+
+    if (deadline - now > SPIN_THRESHOLD_NS) {
+        struct timespec ts;
+
+        ts.tv_sec = deadline / 1000000000LL;
+        ts.tv_nsec = deadline % 1000000000LL;
+        while (clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, &ts, NULL) == EINTR)
+            ;
+        now = now_ns();
+    }
+    while (now < deadline)
+        now = now_ns();
+    return now;
+}
+
+/* timerfd periódico: igual que _timing.EdgeTimer */
+static int
+timer_arm(int tfd, int64_t interval_ns)
+{
+    struct itimerspec its;
+
+    its.it_interval.tv_sec = interval_ns / 1000000000LL;
+    its.it_interval.tv_nsec = interval_ns % 1000000000LL;
+    its.it_value = its.it_interval;
+    return timerfd_settime(tfd, 0, &its, NULL);
+}
+
+static int
+timer_wait(int tfd, int64_t interval_ns)
+{
+    uint64_t ticks;
+    ssize_t n;
+
+    do {
+        n = read(tfd, &ticks, sizeof(ticks));
+    } while (n < 0 && errno == EINTR);
+    if (n != (ssize_t)sizeof(ticks))
+        return -1;
+    /* Llegamos tarde: rearmar para no pegar el siguiente flanco */
+    if (ticks > 1)
+        return timer_arm(tfd, interval_ns);
+    return 0;
+}
+
+static inline int
+set_lines(int fd, uint64_t mask, uint64_t bits)
+{
+    struct gpio_v2_line_values lv;
+
+    lv.mask = mask;
+    lv.bits = bits;
+    return ioctl(fd, GPIO_V2_LINE_SET_VALUES_IOCTL, &lv);
+}
+
+/* Codificación de flancos: ver _EDGE_* en tm1637.py */
+#define EDGE_CLK  0x1ULL
+#define EDGE_DIO  0x2ULL
+#define EDGE_WAIT (1ULL << 63)
+
+PyDoc_STRVAR(write_edges_doc,
+"write_edges(fd, clk_mask, dio_mask, edges, delay_ns, timer_fd=-1)\n"
+"\n"
+"Aplica la secuencia de flancos precodificada `edges` (array('Q')) a las\n"
+"líneas del LineRequest `fd`. `clk_mask`/`dio_mask` son los bits de cada\n"
+"línea dentro de la petición y `delay_ns` la espera de los flancos que\n"
+"llevan el bit de espera. Con `timer_fd` >= 0 (un timerfd) las esperas\n"
+"se hacen bloqueando en él en lugar de con espera activa.");
+
+static PyObject *
+write_edges(PyObject *self, PyObject *args)
+{
+    int fd;
+    unsigned long long clk_mask, dio_mask;
+    Py_buffer view;
+    long long delay_ns;
+    int timer_fd = -1;
+    int ret = 0, err = 0;
+
+    (void)self;
+
+    if (!PyArg_ParseTuple(args, "iKKy*L|i", &fd, &clk_mask, &dio_mask, &view, &delay_ns,
+                          &timer_fd))
+        return NULL;
+
+    if (view.len % sizeof(uint64_t) != 0) {
+        PyBuffer_Release(&view);
+        PyErr_SetString(PyExc_ValueError, "edges must be a buffer of 64-bit words");
+        return NULL;
+    }
+
+    const uint64_t *edges = view.buf;
+    Py_ssize_t n = view.len / (Py_ssize_t)sizeof(uint64_t);
+
+    /* START/STOP no esperan nunca: sin flancos de espera no se arma el timer */
+    if (timer_fd >= 0) {
+        Py_ssize_t i = 0;
+
+        while (i < n && !(edges[i] & EDGE_WAIT))
+            i++;
+        if (i == n)
+            timer_fd = -1;
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+    int64_t deadline = now_ns();
+
+    if (timer_fd >= 0 && (ret = timer_arm(timer_fd, delay_ns)) < 0)
+        err = errno;
+
+    for (Py_ssize_t i = 0; i < n && ret == 0; i++) {
+        uint64_t word = edges[i];
+        uint64_t lines = word >> 32;
+        uint64_t mask = 0, bits = 0;
+
+        if (lines & EDGE_CLK) {
+            mask |= clk_mask;
+            if (word & EDGE_CLK)
+                bits |= clk_mask;
+        }
+        if (lines & EDGE_DIO) {
+            mask |= dio_mask;
+            if (word & EDGE_DIO)
+                bits |= dio_mask;
+        }
+
+        if ((ret = set_lines(fd, mask, bits)) < 0) {
+            err = errno;
+            break;
+        }
+        if (word & EDGE_WAIT) {
+            if (timer_fd < 0)
+                deadline = wait_until(deadline + delay_ns);
+            else if ((ret = timer_wait(timer_fd, delay_ns)) < 0)
+                err = errno;
+        }
+    }
+
+    if (timer_fd >= 0)
+        timer_arm(timer_fd, 0);  /* desarmar: no dejar ticks cada delay_ns */
+    Py_END_ALLOW_THREADS
+
+    PyBuffer_Release(&view);
+
+    if (ret < 0) {
+        errno = err;
+        return PyErr_SetFromErrno(PyExc_OSError);
+    }
+
+    Py_RETURN_NONE;
+}
+
+static PyMethodDef tm1637_c_methods[] = {
+    {"write_edges", write_edges, METH_VARARGS, write_edges_doc},
+    {NULL, NULL, 0, NULL},
+};
+
+static struct PyModuleDef tm1637_c_module = {
+    PyModuleDef_HEAD_INIT,
+    "_tm1637_c",
+    "Camino rápido en C (ioctl GPIO v2) para el driver TM1637.",
+    -1,
+    tm1637_c_methods,
+};
+
+PyMODINIT_FUNC
+PyInit__tm1637_c(void)
+{
+    return PyModule_Create(&tm1637_c_module);
+}
@@ -11,9 +11,13 @@ Compatibility:
 - gpiod v2 (binding oficial: LineSettings, Direction, Value, request_lines)
 """
 
+from array import array
 from time import sleep
+import glob
 import gpiod
-import os
+
+from ._mmio import RP1RIO
+from ._timing import EdgeTimer, monotonic_ns, wait_until
 
 try:
     # gpiod v2 (binding oficial): tiene submódulo gpiod.line y LineSettings
@@ -24,6 +28,12 @@ except Exception:  # gpiod v1 (python3-libgpiod clásico o python3-gpiod)
     _Value = None       # type: ignore[assignment]
     _HAS_GPIOD_V2 = False
 
+try:
+    # Extensión C opcional: envío de flancos con ioctl directo (solo v2)
+    from . import _tm1637_c  # type: ignore[attr-defined]
+except ImportError:
+    _tm1637_c = None  # type: ignore[assignment]
+
 TM1637_CMD1 = 0x40
 TM1637_CMD2 = 0xC0
 TM1637_CMD3 = 0x80
@@ -31,65 +41,223 @@ TM1637_DSP_ON = 0x08
 TM1637_DELAY = 0.00001
 TM1637_MSB = 0x80
 
-_SEGMENTS = bytearray(
+_DELAY_NS = round(TM1637_DELAY * 1_000_000_000)
+
+# Flancos precodificados (array('Q')): una palabra de 64 bits por flanco con
+# las líneas afectadas en bits 32-33, sus valores en bits 0-1 y, en el bit 63,
+# si hay que esperar TM1637_DELAY antes del siguiente flanco.
+_EDGE_CLK = 0x1
+_EDGE_DIO = 0x2
+_EDGE_WAIT = 1 << 63
+_EDGE_KEY = _EDGE_WAIT - 1  # palabra sin el bit de espera
+
+
+def _edge(mask: int, values: int, wait: bool = True) -> int:
+    return (_EDGE_WAIT if wait else 0) | mask << 32 | values
+
+
+# Todas las combinaciones (líneas, valores) posibles: los backends montan con
+# ellas sus tablas de flanco -> operación
+_EDGE_KEYS = tuple(
+    _edge(mask, values, wait=False)
+    for mask in (_EDGE_CLK, _EDGE_DIO, _EDGE_CLK | _EDGE_DIO)
+    for values in range(4)
+    if values & ~mask == 0
+)
+
+
+# Pulso de reloj del ACK tras los 8 bits: solo CLK, DIO no cambia
+_ACK_EDGES = array("Q", (
+    _edge(_EDGE_CLK, 0),
+    _edge(_EDGE_CLK, _EDGE_CLK),
+    _edge(_EDGE_CLK, 0, wait=False),
+))
+
+
+def _encode_byte_edges(b: int) -> array:
+    """
+    Secuencia de flancos para enviar `b` (LSB primero) más el pulso de ACK.
+    """
+    edges = array("Q")
+    for i in range(8):
+        edges.append(_edge(_EDGE_DIO, _EDGE_DIO if (b >> i) & 1 else 0))
+        edges.append(_edge(_EDGE_CLK, _EDGE_CLK))
+        edges.append(_edge(_EDGE_CLK, 0))
+
+    edges += _ACK_EDGES
+    return edges
+
+
+_BYTE_EDGES = tuple(_encode_byte_edges(b) for b in range(256))
+
+# Condiciones de start/stop: CLK y DIO a la vez, sin espera entre flancos
+_BOTH = _EDGE_CLK | _EDGE_DIO
+# Valores de LineBulk.set_values([clk, dio]) (gpiod v1), indexados por clk | dio << 1
+_BULK_LEVELS = tuple([s & _EDGE_CLK, (s & _EDGE_DIO) >> 1] for s in range(4))
+_START_EDGES = array("Q", (
+    _edge(_BOTH, _EDGE_CLK | _EDGE_DIO, wait=False),
+    _edge(_BOTH, _EDGE_CLK, wait=False),
+    _edge(_BOTH, 0, wait=False),
+))
+_STOP_EDGES = array("Q", (
+    _edge(_BOTH, 0, wait=False),
+    _edge(_BOTH, _EDGE_CLK, wait=False),
+    _edge(_BOTH, _EDGE_CLK | _EDGE_DIO, wait=False),
+))
+
+
+def _build_frame(segments, pos: int, dsp_ctrl: int | None) -> array:
+    """
+    Secuencia de flancos completa de un refresco de `write()`:
+
+        start CMD1 stop | start CMD2|pos seg... stop | start dsp_ctrl stop
+
+    `dsp_ctrl` es el byte de control ya montado (CMD3 | DSP_ON | brillo);
+    con None se omite la última trama.
+    """
+    frame = array("Q")
+    frame += _START_EDGES
+    frame += _BYTE_EDGES[TM1637_CMD1]
+    frame += _STOP_EDGES
+    frame += _START_EDGES
+    frame += _BYTE_EDGES[TM1637_CMD2 | pos]
+    for seg in segments:
+        frame += _BYTE_EDGES[seg & 0xFF]
+    frame += _STOP_EDGES
+    if dsp_ctrl is not None:
+        frame += _START_EDGES
+        frame += _BYTE_EDGES[dsp_ctrl]
+        frame += _STOP_EDGES
+    return frame
+
+
+_SEGMENTS = (
     b'\x3F\x06\x5B\x4F\x66\x6D\x7D\x07\x7F\x6F\x77\x7C\x39\x5E\x79\x71'
     b'\x3D\x76\x06\x1E\x76\x38\x55\x54\x3F\x73\x67\x50\x6D\x78\x3E\x1C'
     b'\x2A\x76\x6E\x5B\x00\x40\x63'
 )
 
+# Tabla ASCII -> segmentos para bytes.translate(); 0xFF marca carácter inválido
+_CHAR_INVALID = 0xFF
+
+
+def _build_char_lut() -> bytes:
+    lut = bytearray([_CHAR_INVALID]) * 256
+    lut[ord(" ")] = _SEGMENTS[36]
+    lut[ord("*")] = _SEGMENTS[38]
+    lut[ord("-")] = _SEGMENTS[37]
+    for o in range(ord("A"), ord("Z") + 1):
+        lut[o] = _SEGMENTS[o - 55]
+    for o in range(ord("a"), ord("z") + 1):
+        lut[o] = _SEGMENTS[o - 87]
+    for o in range(ord("0"), ord("9") + 1):
+        lut[o] = _SEGMENTS[o - 48]
+    return bytes(lut)
+
+
+_CHAR_LUT = _build_char_lut()
+
+
+# Pares de segmentos ya codificados para 00..99 (lo que numbers() pinta)
+_TWO_DIGIT_SEGS = tuple(
+    bytes((_SEGMENTS[n // 10], _SEGMENTS[n % 10])) for n in range(100)
+)
+
+
+def _char_error(char: str) -> ValueError:
+    return ValueError(f"Character out of range: {ord(char)} '{char}'")
+
+def _chip_has_line_v1(chip, line_offset: int) -> bool:
+    """
+    Comprueba con la API v1 si `chip` tiene la línea `line_offset`.
+    """
+    # python3-libgpiod expone num_lines() (método); otras variantes, atributo
+    num_lines = getattr(chip, "num_lines", None)
+    if callable(num_lines):
+        num_lines = num_lines()
+    if isinstance(num_lines, int):
+        return line_offset < num_lines
+
+    # Sin num_lines: probamos varios métodos según la versión
+    get_line = getattr(chip, "get_line", None)
+    get_line_by_offset = getattr(chip, "get_line_by_offset", None)
+
+    if get_line is not None:
+        line = get_line(line_offset)
+    elif get_line_by_offset is not None:
+        line = get_line_by_offset(line_offset)
+    else:
+        raise AttributeError(
+            "Chip object has neither get_line nor get_line_by_offset"
+        )
+
+    # Forzamos acceso a algún atributo para validar (si no existe, excepción)
+    _ = getattr(line, "info", None)
+    return True
+
+
+# line_offset -> ruta del gpiochip que la contiene, compartido entre instancias
+_CHIP_CACHE: dict[int, str] = {}
+
+
 def find_gpiochip_for_line(line_offset: int) -> gpiod.Chip:
     """
     Busca el /dev/gpiochip* que tenga la línea `line_offset`.
 
     Devuelve un objeto gpiod.Chip (tanto en v1 como en v2).
     Lanza RuntimeError si no encuentra ninguno.
+
+    El resultado se memoriza por offset: las siguientes llamadas abren
+    directamente el chip ya encontrado sin volver a recorrer /dev.
     """
-    last_error: Exception | None = None
+    cached_path = _CHIP_CACHE.get(line_offset)
+    if cached_path is not None:
+        try:
+            return gpiod.Chip(cached_path)
+        except Exception:  # noqa: BLE001
+            # El chip ha desaparecido (p. ej. overlay descargado): re-escaneamos
+            del _CHIP_CACHE[line_offset]
 
-    for chip_name in sorted(os.listdir("/dev")):
-        if not chip_name.startswith("gpiochip"):
-            continue
+    last_error: Exception | None = None
 
-        chip_path = f"/dev/{chip_name}"
+    # Cada chip se descarta comparando el offset con su num_lines, en vez de
+    # probar get_line_info() y capturar la excepción cuando no existe
+    for chip_path in sorted(glob.glob("/dev/gpiochip*")):
+        chip = None
 
         try:
             chip = gpiod.Chip(chip_path)
 
             if _HAS_GPIOD_V2:
-                # API v2: si la línea no existe, esto levanta excepción
-                chip.get_line_info(line_offset)
+                # API v2: get_info() es un único GPIO_GET_CHIPINFO_IOCTL
+                has_line = line_offset < chip.get_info().num_lines
             else:
-                # API v1: probamos varios métodos según la versión
-                get_line = getattr(chip, "get_line", None)
-                get_line_by_offset = getattr(chip, "get_line_by_offset", None)
-
-                if get_line is not None:
-                    line = get_line(line_offset)
-                elif get_line_by_offset is not None:
-                    line = get_line_by_offset(line_offset)
-                else:
-                    raise AttributeError(
-                        "Chip object has neither get_line nor get_line_by_offset"
-                    )
+                has_line = _chip_has_line_v1(chip, line_offset)
 
-                # Forzamos acceso a algún atributo para validar
-                _ = getattr(line, "info", None)
-
-            # Si ha llegado hasta aquí, este chip sirve
-            return chip
+            if has_line:
+                _CHIP_CACHE[line_offset] = chip_path
+                return chip
 
         except Exception as exc:  # noqa: BLE001
             last_error = exc
+
+        if chip is not None:
             try:
                 chip.close()
             except Exception:  # noqa: BLE001
                 pass
-            continue
 
     raise RuntimeError(f"No gpiochip found with line offset {line_offset}") from last_error
 
 class TM1637:
-    def __init__(self, clk: int, dio: int, brightness: int = 7):
+    def __init__(
+        self,
+        clk: int,
+        dio: int,
+        brightness: int = 7,
+        mmio: bool = False,
+        timerfd: bool = False,
+    ):
         self.clk = int(clk)
         self.dio = int(dio)
 
@@ -97,33 +265,95 @@ class TM1637:
             raise ValueError("Brightness out of range")
 
         self._brightness = brightness
+        self._dsp_ctrl_byte = TM1637_CMD3 | TM1637_DSP_ON | brightness
+        # El control de display aún no se ha enviado: el primer write() lo manda
+        self._dsp_ctrl_dirty = True
+        # Buffer de segmentos (uno por dígito) reutilizado por numbers()
+        self._seg_buf = bytearray(4)
+        # Espera entre flancos: activa por defecto, timerfd si se pide
+        self._wait = wait_until
+        self._timer = None
+        self._timer_fd = -1
+        self._c_args = None
+        self._closed = False
         self._use_v2 = bool(_HAS_GPIOD_V2)
 
         # Chip válido para la línea clk (en Pi todo va en el mismo)
         self.chip = find_gpiochip_for_line(self.clk)
 
+        # El envío de flancos se especializa aquí una sola vez por backend.
+        # Se guarda la función sin ligar (TM1637._send_edges_*): un método
+        # ligado de self guardado en self crearía un ciclo de referencias y la
+        # petición gpiod no se liberaría al soltar el objeto.
         if self._use_v2:
             # --- Backend gpiod v2 ------------------------------------------
             self._init_backend_v2()
+            if self._c_args is not None:
+                self._send_impl = TM1637._send_edges_c
+            else:
+                self._send_impl = TM1637._send_edges_v2
         else:
             # --- Backend gpiod v1 ------------------------------------------
             self._init_backend_v1()
+            if self.lines is not None:
+                self._send_impl = TM1637._send_edges_v1
+            else:
+                self._send_impl = TM1637._send_edges_v1_lines
 
-    def _init_backend_v1(self) -> None:
+        # --- MMIO opcional (RP1, Pi 5): gpiod configura, MMIO escribe ------
+        self._rio = None
+        if mmio:
+            self._init_backend_mmio()
 
-        get_line = getattr(self.chip, "get_line", None)
-        get_line_by_offset = getattr(self.chip, "get_line_by_offset", None)
+        # --- timerfd opcional: esperas bloqueantes en vez de activas -------
+        if timerfd:
+            self._init_timer()
 
-        if get_line is not None:
-            self.clk_line = get_line(self.clk)
-            self.dio_line = get_line(self.dio)
-        elif get_line_by_offset is not None:
-            self.clk_line = get_line_by_offset(self.clk)
-            self.dio_line = get_line_by_offset(self.dio)
-        else:
-            raise RuntimeError(
-                "gpiod v1: Chip has no get_line or get_line_by_offset method"
-            )
+    def _init_timer(self) -> None:
+        try:
+            self._timer = EdgeTimer(_DELAY_NS)
+        except OSError:
+            # Sin timerfd: seguimos con espera activa
+            return
+
+        # La extensión C arma/lee el timerfd ella misma entre ioctls, salvo
+        # que MMIO haya sustituido su camino de envío
+        self._timer_fd = self._timer.fd
+        use_c = self._c_args is not None and self._rio is None
+        if not use_c:
+            self._wait = self._timer.wait
+            self._send_untimed = self._send_impl
+            self._send_impl = TM1637._send_edges_timed
+
+    def _init_backend_mmio(self) -> None:
+        try:
+            clk_mask = RP1RIO.line_mask(self.clk)
+            dio_mask = RP1RIO.line_mask(self.dio)
+            self._rio = RP1RIO()
+        except (OSError, ValueError):
+            # Sin /dev/gpiomem0 (no es una Pi 5) o líneas fuera del banco 0:
+            # seguimos con gpiod
+            return
+
+        self._set_reg = self._rio.set_reg
+        self._clr_reg = self._rio.clr_reg
+
+        # Flanco -> (máscara para SET, máscara para CLR)
+        self._edge_regs = {}
+        for key in _EDGE_KEYS:
+            high = low = 0
+            for bit, line_mask in ((_EDGE_CLK, clk_mask), (_EDGE_DIO, dio_mask)):
+                if (key >> 32) & bit:
+                    if key & bit:
+                        high |= line_mask
+                    else:
+                        low |= line_mask
+            self._edge_regs[key] = (high, low)
+
+        # Escribir en los registros es más rápido que el ioctl de la extensión C
+        self._send_impl = TM1637._send_edges_mmio
+
+    def _init_backend_v1(self) -> None:
 
         req_type = None
 
@@ -139,6 +369,36 @@ class TM1637:
                 "(expected Line.REQUEST_DIRECTION_OUTPUT or LINE_REQ_DIR_OUT)"
             )
 
+        get_lines = getattr(self.chip, "get_lines", None)
+        if get_lines is not None:
+            # Ambas líneas en una sola petición (LineBulk): set_values([clk, dio])
+            # las escribe con un único ioctl
+            self.lines = get_lines([self.clk, self.dio])
+            self.lines.request(
+                consumer="tm1637",
+                type=req_type,
+                default_vals=[0, 0],
+            )
+            self._bulk_set = self.lines.set_values
+            self._bulk_state = 0  # clk | dio << 1, igual que default_vals
+            return
+
+        # Bindings v1 sin get_lines(): una petición por línea
+        self.lines = None
+        get_line = getattr(self.chip, "get_line", None)
+        get_line_by_offset = getattr(self.chip, "get_line_by_offset", None)
+
+        if get_line is not None:
+            self.clk_line = get_line(self.clk)
+            self.dio_line = get_line(self.dio)
+        elif get_line_by_offset is not None:
+            self.clk_line = get_line_by_offset(self.clk)
+            self.dio_line = get_line_by_offset(self.dio)
+        else:
+            raise RuntimeError(
+                "gpiod v1: Chip has no get_lines, get_line or get_line_by_offset method"
+            )
+
         self.clk_line.request(
             consumer="tm1637",
             type=req_type,
@@ -150,6 +410,9 @@ class TM1637:
             default_vals=[0],
         )
 
+        self._clk_set = self.clk_line.set_value
+        self._dio_set = self.dio_line.set_value
+
     def _init_backend_v2(self) -> None:
 
         if _Direction is None or _Value is None or not hasattr(gpiod, "LineSettings"):
@@ -182,37 +445,77 @@ class TM1637:
                 raise RuntimeError("gpiod v2: request_lines API not found")
             self._request = chip_request_lines(config, consumer="tm1637")
 
-    def _set_clk(self, value: int) -> None:
-        if self._use_v2:
-            # API v2: set_value(offset, Value.ACTIVE/INACTIVE)
-            self._request.set_value(
-                self.clk,
-                _Value.ACTIVE if value else _Value.INACTIVE,  # type: ignore[arg-type]
+        # Referencias cacheadas para el camino caliente (un flanco por llamada)
+        self._set_vals = self._request.set_values
+        high = _Value.ACTIVE
+        low = _Value.INACTIVE
+
+        # Flanco -> diccionario de set_values() ya montado (un ioctl por flanco)
+        self._edge_vals = {}
+        for key in _EDGE_KEYS:
+            vals = {}
+            for bit, offset in ((_EDGE_CLK, self.clk), (_EDGE_DIO, self.dio)):
+                if (key >> 32) & bit:
+                    vals[offset] = high if key & bit else low
+            self._edge_vals[key] = vals
+
+        # Camino rápido en C: necesita el fd del LineRequest y la posición de
+        # cada línea dentro de la petición (bit del ioctl SET_VALUES)
+        self._c_args = None
+        fd = getattr(self._request, "fd", None)
+        offsets = list(getattr(self._request, "offsets", ()))
+        if _tm1637_c is not None and fd is not None and self.clk in offsets and self.dio in offsets:
+            self._c_args = (
+                fd,
+                1 << offsets.index(self.clk),
+                1 << offsets.index(self.dio),
             )
-        else:
-            # API v1: line.set_value(0/1)
-            self.clk_line.set_value(int(bool(value)))
 
-    def _set_dio(self, value: int) -> None:
+    def close(self) -> None:
+        """
+        Libera las líneas GPIO, el timerfd y el mapeo MMIO.
+
+        Se puede llamar más de una vez; después el display ya no acepta
+        escrituras. También se usa como gestor de contexto (`with TM1637(...)`).
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._send_impl = TM1637._send_edges_closed
+
+        if self._timer is not None:
+            self._timer.close()
+            self._timer = None
+            self._timer_fd = -1
+            self._wait = wait_until
+
+        if self._rio is not None:
+            # Las vistas ctypes deben soltarse antes de cerrar el mmap
+            self._set_reg = self._clr_reg = None
+            self._rio.close()
+            self._rio = None
+
         if self._use_v2:
-            self._request.set_value(
-                self.dio,
-                _Value.ACTIVE if value else _Value.INACTIVE,  # type: ignore[arg-type]
-            )
+            self._request.release()
+        elif self.lines is not None:
+            self.lines.release()
         else:
-            self.dio_line.set_value(int(bool(value)))
+            self.clk_line.release()
+            self.dio_line.release()
+
+        self.chip.close()
+
+    def __enter__(self) -> "TM1637":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
 
     def _start(self):
-        self._set_clk(1)
-        self._set_dio(1)
-        self._set_dio(0)
-        self._set_clk(0)
+        self._send_edges(_START_EDGES)
 
     def _stop(self):
-        self._set_clk(0)
-        self._set_dio(0)
-        self._set_clk(1)
-        self._set_dio(1)
+        self._send_edges(_STOP_EDGES)
 
     def _write_data_cmd(self):
         self._start()
@@ -221,23 +524,102 @@ class TM1637:
 
     def _write_dsp_ctrl(self):
         self._start()
-        self._write_byte(TM1637_CMD3 | TM1637_DSP_ON | self._brightness)
+        self._write_byte(self._dsp_ctrl_byte)
         self._stop()
+        self._dsp_ctrl_dirty = False
 
     def _write_byte(self, b):
-        for i in range(8):
-            self._set_dio((b >> i) & 1)
-            sleep(TM1637_DELAY)
-            self._set_clk(1)
-            sleep(TM1637_DELAY)
-            self._set_clk(0)
-            sleep(TM1637_DELAY)
-
-        self._set_clk(0)
-        sleep(TM1637_DELAY)
-        self._set_clk(1)
-        sleep(TM1637_DELAY)
-        self._set_clk(0)
+        self._send_edges(_BYTE_EDGES[b])
+
+    # --- Envío de flancos, especializado por backend en __init__ ----------
+    #
+    # Plazos absolutos: cada flanco con _EDGE_WAIT se separa TM1637_DELAY del
+    # siguiente sin acumular el retraso de las esperas relativas. Con timerfd,
+    # self._wait bloquea hasta el siguiente tick en lugar de esperar activamente.
+
+    def _send_edges(self, edges: array) -> None:
+        self._send_impl(self, edges)
+
+    def _send_edges_closed(self, edges: array) -> None:
+        raise RuntimeError("TM1637 is closed")
+
+    def _send_edges_c(self, edges: array) -> None:
+        fd, clk_mask, dio_mask = self._c_args
+        _tm1637_c.write_edges(fd, clk_mask, dio_mask, edges, _DELAY_NS, self._timer_fd)
+
+    def _send_edges_timed(self, edges: array) -> None:
+        # START/STOP no esperan nunca: no merece la pena armar el timer
+        if not any(word & _EDGE_WAIT for word in edges):
+            self._send_untimed(self, edges)
+            return
+        self._timer.arm()
+        try:
+            self._send_untimed(self, edges)
+        finally:
+            # No dejar el timer disparando cada TM1637_DELAY entre refrescos
+            self._timer.disarm()
+
+    def _send_edges_v1(self, edges: array) -> None:
+        # API v1 con LineBulk: set_values() escribe siempre las dos líneas, así
+        # que en los flancos de una sola línea la otra sale del estado cacheado
+        bulk_set = self._bulk_set
+        wait = self._wait
+        state = self._bulk_state
+        deadline = monotonic_ns()
+
+        try:
+            for word in edges:
+                mask = (word >> 32) & _BOTH
+                state = (state & ~mask) | (word & mask)
+                bulk_set(_BULK_LEVELS[state])
+                if word & _EDGE_WAIT:
+                    deadline = wait(deadline + _DELAY_NS)
+        finally:
+            self._bulk_state = state
+
+    def _send_edges_v1_lines(self, edges: array) -> None:
+        # API v1 sin get_lines(): cada línea tiene su propia petición
+        clk_set = self._clk_set
+        dio_set = self._dio_set
+        wait = self._wait
+        deadline = monotonic_ns()
+
+        for word in edges:
+            lines = word >> 32
+            if lines & _EDGE_CLK:
+                clk_set(word & _EDGE_CLK)
+            if lines & _EDGE_DIO:
+                dio_set((word & _EDGE_DIO) >> 1)
+            if word & _EDGE_WAIT:
+                deadline = wait(deadline + _DELAY_NS)
+
+    def _send_edges_v2(self, edges: array) -> None:
+        # API v2: ambas líneas van en el mismo LineRequest -> un solo ioctl
+        set_vals = self._set_vals
+        edge_vals = self._edge_vals
+        wait = self._wait
+        deadline = monotonic_ns()
+
+        for word in edges:
+            set_vals(edge_vals[word & _EDGE_KEY])
+            if word & _EDGE_WAIT:
+                deadline = wait(deadline + _DELAY_NS)
+
+    def _send_edges_mmio(self, edges: array) -> None:
+        set_reg = self._set_reg
+        clr_reg = self._clr_reg
+        edge_regs = self._edge_regs
+        wait = self._wait
+        deadline = monotonic_ns()
+
+        for word in edges:
+            high, low = edge_regs[word & _EDGE_KEY]
+            if high:
+                set_reg.value = high
+            if low:
+                clr_reg.value = low
+            if word & _EDGE_WAIT:
+                deadline = wait(deadline + _DELAY_NS)
 
     def brightness(self, val: int | None = None) -> int | None:
         if val is None:
@@ -247,60 +629,69 @@ class TM1637:
             raise ValueError("Brightness out of range")
 
         self._brightness = val
+        self._dsp_ctrl_byte = TM1637_CMD3 | TM1637_DSP_ON | val
+        self._dsp_ctrl_dirty = True
         self._write_data_cmd()
         self._write_dsp_ctrl()
         return None
 
-    def write(self, segments, pos: int = 0) -> None:
+    def write(self, segments, pos: int = 0, refresh_ctrl: bool = False) -> None:
         if not 0 <= pos <= 3:
             raise ValueError("Position out of range")
 
-        self._write_data_cmd()
-        self._start()
-        self._write_byte(TM1637_CMD2 | pos)
-
-        for seg in segments:
-            self._write_byte(seg)
+        # El control de display solo se reenvía si ha cambiado (o se pide
+        # expresamente, p. ej. tras un corte de alimentación del módulo)
+        if self._dsp_ctrl_dirty or refresh_ctrl:
+            dsp_ctrl = self._dsp_ctrl_byte
+        else:
+            dsp_ctrl = None
 
-        self._stop()
-        self._write_dsp_ctrl()
+        # Todo el refresco en una sola secuencia de flancos
+        self._send_edges(_build_frame(segments, pos, dsp_ctrl))
+        self._dsp_ctrl_dirty = False
 
     def encode_digit(self, digit: int) -> int:
         return _SEGMENTS[digit & 0x0F]
 
     def encode_string(self, string: str) -> bytearray:
-        segments = bytearray(len(string))
-        for i, char in enumerate(string):
-            segments[i] = self.encode_char(char)
+        try:
+            segments = bytearray(string, "ascii").translate(_CHAR_LUT)
+        except UnicodeEncodeError as exc:
+            raise _char_error(string[exc.start]) from None
+
+        bad = segments.find(_CHAR_INVALID)
+        if bad >= 0:
+            raise _char_error(string[bad])
         return segments
 
     def encode_char(self, char: str) -> int:
         o = ord(char)
-
-        if o == 32:  # espacio
-            return _SEGMENTS[36]
-        if o == 42:  # '*'
-            return _SEGMENTS[38]
-        if o == 45:  # '-'
-            return _SEGMENTS[37]
-        if 65 <= o <= 90:  # A-Z
-            return _SEGMENTS[o - 55]
-        if 97 <= o <= 122:  # a-z
-            return _SEGMENTS[o - 87]
-        if 48 <= o <= 57:  # 0-9
-            return _SEGMENTS[o - 48]
-
-        raise ValueError(f"Character out of range: {o} '{char}'")
+        seg = _CHAR_LUT[o] if o < 256 else _CHAR_INVALID
+        if seg == _CHAR_INVALID:
+            raise _char_error(char)
+        return seg
 
     def numbers(self, num1: int, num2: int, colon: bool = True) -> None:
         num1 = max(-9, min(num1, 99))
         num2 = max(-9, min(num2, 99))
 
-        segments = self.encode_string(f"{num1:02d}{num2:02d}")
+        # Negativos (-9..-1): signo menos + dígito, como "{:02d}"
+        buf = self._seg_buf
+        if num1 >= 0:
+            buf[0:2] = _TWO_DIGIT_SEGS[num1]
+        else:
+            buf[0] = _SEGMENTS[37]
+            buf[1] = _SEGMENTS[-num1]
+        if num2 >= 0:
+            buf[2:4] = _TWO_DIGIT_SEGS[num2]
+        else:
+            buf[2] = _SEGMENTS[37]
+            buf[3] = _SEGMENTS[-num2]
+
         if colon:
-            segments[1] |= TM1637_MSB  # activar dos puntos
+            buf[1] |= TM1637_MSB  # activar dos puntos
 
-        self.write(segments)
+        self.write(buf)
 
     def temperature(self, num: int) -> None:
         if num < -9:
@@ -321,8 +712,10 @@ class TM1637:
 
     def scroll(self, string: str, delay: int = 250) -> None:
         segments = self.encode_string(string)
-        data = [0] * 8
-        data[4:0] = list(segments)
+        # 4 posiciones en blanco a cada lado para que el texto entre y salga
+        data = bytearray(len(segments) + 8)
+        data[4 : 4 + len(segments)] = segments
+        d = delay / 1000.0
         for i in range(len(segments) + 5):
             self.write(data[i : i + 4])
-            sleep(delay / 1000.0)
+            sleep(d)